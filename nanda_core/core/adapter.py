@@ -7,14 +7,19 @@ Simple, clean adapter focused on A2A communication without complexity.
 """
 
 import os
-import requests
+import ast
+import functools
 from typing import Optional, Callable
 from python_a2a import run_server
 from .agent_bridge import SimpleAgentBridge
+from ..utils.http import create_http_session
 
 
 class NANDA:
     """Simple NANDA class for clean agent deployment"""
+
+    __slots__ = ('agent_id', 'agent_logic', 'port', 'registry_url', 'public_url', 'host',
+                 'enable_telemetry', '_http', 'telemetry', 'bridge')
     
     def __init__(self, 
                  agent_id: str,
@@ -23,7 +28,8 @@ class NANDA:
                  registry_url: Optional[str] = None,
                  public_url: Optional[str] = None,
                  host: str = "0.0.0.0",
-                 enable_telemetry: bool = False):
+                 enable_telemetry: bool = False,
+                 async_outbound: bool = False):
         """
         Create a simple NANDA agent
         
@@ -35,6 +41,9 @@ class NANDA:
             public_url: Public URL for agent registration (e.g., https://yourdomain.com:6000)
             host: Host to bind to
             enable_telemetry: Enable telemetry logging (optional)
+            async_outbound: Acknowledge '@agent' messages immediately and send them in the
+                background; replies are fetched with /replies in the same conversation
+                (A2A is request/response, so they can't be pushed). Works without public_url.
         """
         self.agent_id = agent_id
         self.agent_logic = agent_logic
@@ -43,6 +52,9 @@ class NANDA:
         self.public_url = public_url
         self.host = host
         self.enable_telemetry = enable_telemetry
+
+        # Pooled keep-alive session for registry calls
+        self._http = create_http_session()
         
         # Initialize telemetry if enabled
         self.telemetry = None
@@ -60,7 +72,8 @@ class NANDA:
             agent_logic=agent_logic,
 	    url=public_url,
             registry_url=registry_url,
-            telemetry=self.telemetry
+            telemetry=self.telemetry,
+            async_outbound=async_outbound
         )
         
         print(f"🤖 NANDA Agent '{agent_id}' created")
@@ -87,7 +100,7 @@ class NANDA:
                 "agent_id": self.agent_id,
                 "agent_url": self.public_url
             }
-            response = requests.post(f"{self.registry_url}/register", json=data, timeout=10)
+            response = self._http.post(f"{self.registry_url}/register", json=data, timeout=10)
             if response.status_code == 200:
                 print(f"✅ Agent '{self.agent_id}' registered successfully")
             else:
@@ -117,6 +130,27 @@ def pirate_agent(message: str, conversation_id: str) -> str:
     return f"Arrr! {message}, matey!"
 
 
+# Arithmetic allowed in helpful_agent calculations
+_CALC_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+               ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+               ast.UAdd, ast.USub)
+_CALC_TRANSLATION = str.maketrans({'x': '*', 'X': '*'})
+_ARITH_OPS = frozenset('+-*/')
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expr(src: str):
+    """Compile an arithmetic expression, rejecting anything but numbers and operators"""
+    tree = ast.parse(src, mode='eval')
+    for node in ast.walk(tree):
+        if not isinstance(node, _CALC_NODES):
+            raise ValueError(f"Unsupported expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and (
+                isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError("Only numeric constants are supported")
+    return compile(tree, '<calc>', 'eval')
+
+
 def helpful_agent(message: str, conversation_id: str) -> str:
     """Helpful agent"""
     if "time" in message.lower():
@@ -124,9 +158,9 @@ def helpful_agent(message: str, conversation_id: str) -> str:
         return f"Current time: {datetime.now().strftime('%H:%M:%S')}"
     elif "help" in message.lower():
         return "I can help with time, calculations, and general questions!"
-    elif any(op in message for op in ['+', '-', '*', '/']):
+    elif not _ARITH_OPS.isdisjoint(message):
         try:
-            result = eval(message.replace('x', '*').replace('X', '*'))
+            result = eval(_compile_expr(message.translate(_CALC_TRANSLATION)), {"__builtins__": {}}, {})
             return f"Result: {result}"
         except:
             return "Invalid calculation"
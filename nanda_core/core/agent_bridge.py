@@ -6,30 +6,181 @@ Clean, simple bridge focused on agent-to-agent communication.
 """
 
 import os
+import re
+import json
+import time
+import queue
 import uuid
 import logging
-import requests
-from typing import Callable, Optional, Dict, Any
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Optional, Dict, Any, Tuple, Mapping
 from python_a2a import A2AServer, A2AClient, Message, TextContent, MessageRole, Metadata
+from ..utils.http import create_http_session
 
 # Configure logger to capture conversation logs
 logger = logging.getLogger(__name__)
 
+# Agent-to-agent message envelope: "FROM: <id>\nTO: <id>\nMESSAGE: <text>"
+_ENVELOPE_RE = re.compile(
+    r"^FROM:\s*(?P<from>[^\n]+)\nTO:\s*(?P<to>[^\n]+)\nMESSAGE:\s*(?P<msg>.*)$",
+    re.S
+)
+
+
+def _load_local_agent_registry() -> Mapping[str, str]:
+    """Build the local fallback registry, extended by NANDA_LOCAL_REGISTRY (JSON object)"""
+    agents = {
+        "test_agent": "http://localhost:6000",
+        "pirate_agent": "http://localhost:6001",
+        "helpful_agent": "http://localhost:6002",
+        "echo_agent": "http://localhost:6003",
+        "simple_test_agent": "http://localhost:6005",
+        "agent_alpha": "http://localhost:6010",
+        "agent_beta": "http://localhost:6011"
+    }
+    overrides = os.getenv("NANDA_LOCAL_REGISTRY")
+    if overrides:
+        try:
+            agents.update(json.loads(overrides))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"🏠 Ignoring invalid NANDA_LOCAL_REGISTRY: {e}")
+    return MappingProxyType(agents)
+
+
+# Local discovery fallback (for testing), built once at import
+_LOCAL_AGENT_REGISTRY = _load_local_agent_registry()
+
+# Agent URL lookup cache settings
+LOOKUP_CACHE_TTL = 60.0
+LOOKUP_NEGATIVE_TTL = 5.0
+LOOKUP_CACHE_MAX_SIZE = 1024
+
+# Background telemetry queue settings
+TELEMETRY_QUEUE_SIZE = 10_000
+TELEMETRY_BATCH_SIZE = 256
+
+# Outbound A2A worker pool size (async_outbound only)
+OUTBOUND_MAX_WORKERS = 32
+
+# Async outbound replies held per conversation until fetched with /replies
+PENDING_REPLY_MAX_CONVERSATIONS = 1024
+PENDING_REPLY_MAX_PER_CONVERSATION = 100
+
+_HELP_TEXT = """Available commands:
+/help - Show this help
+/ping - Test agent responsiveness  
+/status - Show agent status
+@agent_id message - Send message to another agent"""
+
+# Help text for bridges with async_outbound, which also have /replies
+_ASYNC_HELP_TEXT = _HELP_TEXT.replace(
+    "\n@agent_id", "\n/replies - Fetch replies to messages sent asynchronously\n@agent_id"
+)
+
+
+def _lru_store(cache: "OrderedDict[str, Any]", key: str, value: Any) -> Any:
+    """Store value in an LRU cache unless key is already present; returns the cached value"""
+    value = cache.setdefault(key, value)
+    cache.move_to_end(key)
+    while len(cache) > LOOKUP_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+class _TelemetryShipper:
+    """Ships telemetry events to a TelemetrySystem from a daemon thread"""
+
+    __slots__ = ('telemetry', 'q', 'dropped_events', 'thread')
+
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self.q = queue.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+        self.dropped_events = 0
+        self.thread = threading.Thread(target=self._drain, name="nanda-telemetry", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, event: Tuple):
+        """Queue an event without blocking; count it as dropped if the queue is full"""
+        try:
+            self.q.put_nowait(event)
+        except queue.Full:
+            self.dropped_events += 1
+
+    def _drain(self):
+        """Wait for events and dispatch them in batches"""
+        while True:
+            batch = [self.q.get()]
+            try:
+                while len(batch) < TELEMETRY_BATCH_SIZE:
+                    batch.append(self.q.get_nowait())
+            except queue.Empty:
+                pass
+
+            for event in batch:
+                try:
+                    self._dispatch(event)
+                except Exception as e:
+                    logger.warning(f"📊 Telemetry event failed: {e}")
+
+    def _dispatch(self, event: Tuple):
+        """Forward a queued event to the underlying telemetry system"""
+        kind, *args = event
+        if kind == "message_received":
+            self.telemetry.log_message_received(*args)
+        elif kind == "message_sent":
+            self.telemetry.log_message_sent(*args)
+
 
 class SimpleAgentBridge(A2AServer):
     """Simple Agent Bridge for A2A communication only"""
+
+    # Slots for the attributes read on every message; A2AServer's own state stays in __dict__
+    __slots__ = ('agent_id', 'agent_logic', 'registry_url', 'telemetry', '_reply_prefix', '_legacy_reply_prefix',
+                 '_telemetry_shipper', '_http', '_lookup_cache', '_lookup_ttl', '_lookup_lock',
+                 '_outbound', '_pending_replies', '_replies_lock', '_a2a_clients',
+                 '_metadata_fields', '_client_lock', '_metadata_lock')
     
     def __init__(self, 
                  agent_id: str, 
                  agent_logic: Callable[[str, str], str],
                	url: Optional[str] = None,
                  registry_url: Optional[str] = None,
-                 telemetry = None):
+                 telemetry = None,
+                 async_outbound: bool = False):
         super().__init__(url=url)
         self.agent_id = agent_id
         self.agent_logic = agent_logic
         self.registry_url = registry_url
         self.telemetry = telemetry
+        self._reply_prefix = f"[{agent_id}] "
+        self._legacy_reply_prefix = f"Response to {agent_id}: "
+        self._telemetry_shipper = _TelemetryShipper(telemetry) if telemetry else None
+
+        # Pooled keep-alive session for registry lookups
+        self._http = create_http_session()
+
+        # agent_id -> (resolved_at, agent_url); agent_url is None for misses
+        self._lookup_cache: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._lookup_ttl = LOOKUP_CACHE_TTL
+        self._lookup_lock = threading.Lock()
+
+        # With async_outbound, '@agent' messages are acknowledged immediately and
+        # sent from a worker pool; replies are held per conversation (LRU-bounded)
+        # until the user fetches them with /replies in that conversation.
+        self._outbound = None
+        if async_outbound:
+            self._outbound = ThreadPoolExecutor(max_workers=OUTBOUND_MAX_WORKERS, thread_name_prefix="nanda-out")
+        self._pending_replies: "OrderedDict[str, deque]" = OrderedDict()
+        self._replies_lock = threading.Lock()
+
+        # Per-target A2A clients and metadata fields, reused across sends (LRU-bounded)
+        self._a2a_clients: "OrderedDict[str, A2AClient]" = OrderedDict()
+        self._metadata_fields: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._client_lock = threading.Lock()
+        self._metadata_lock = threading.Lock()
         
     def handle_message(self, msg: Message) -> Message:
         """Handle incoming messages"""
@@ -43,25 +194,26 @@ class SimpleAgentBridge(A2AServer):
             )
         
         user_text = msg.content.text
+        first = user_text[:1]
         
         # Check if this is an agent-to-agent message in our simple format
-        if user_text.startswith("FROM:") and "TO:" in user_text and "MESSAGE:" in user_text:
-            return self._handle_incoming_agent_message(user_text, msg, conversation_id)
+        envelope = _ENVELOPE_RE.match(user_text) if first == "F" else None
+        if envelope:
+            return self._handle_incoming_agent_message(envelope, msg, conversation_id)
         
-        logger.info(f"📨 [{self.agent_id}] Received: {user_text}")
+        logger.info("📨 [%s] Received: %s", self.agent_id, user_text)
         
         # Handle different message types
         try:
-            if user_text.startswith("@"):
+            if first == "@":
                 # Agent-to-agent message (outgoing)
                 return self._handle_agent_message(user_text, msg, conversation_id)
-            elif user_text.startswith("/"):
+            elif first == "/":
                 # System command
                 return self._handle_command(user_text, msg, conversation_id)
             else:
                 # Regular message - use agent logic
-                if self.telemetry:
-                    self.telemetry.log_message_received(self.agent_id, conversation_id)
+                self._telemetry_enqueue(("message_received", self.agent_id, conversation_id))
                 
                 response = self.agent_logic(user_text, conversation_id)
                 return self._create_response(msg, conversation_id, response)
@@ -72,43 +224,45 @@ class SimpleAgentBridge(A2AServer):
                 f"Error: {str(e)}"
             )
     
-    def _handle_incoming_agent_message(self, user_text: str, msg: Message, conversation_id: str) -> Message:
-        """Handle incoming messages from other agents"""
+    def _handle_incoming_agent_message(self, envelope: "re.Match", msg: Message, conversation_id: str) -> Message:
+        """Handle incoming messages from other agents, given the matched envelope"""
         try:
-            lines = user_text.strip().split('\n')
-            from_agent = ""
-            to_agent = ""
-            message_content = ""
-            
-            for line in lines:
-                if line.startswith("FROM:"):
-                    from_agent = line[5:].strip()
-                elif line.startswith("TO:"):
-                    to_agent = line[3:].strip()
-                elif line.startswith("MESSAGE:"):
-                    message_content = line[8:].strip()
+            # Everything after MESSAGE: is the payload, including any newlines
+            from_agent, to_agent, message_content = envelope.group('from', 'to', 'msg')
+            from_agent = from_agent.strip()
+            to_agent = to_agent.strip()
+            message_content = message_content.strip()
             
-            logger.info(f"📨 [{self.agent_id}] ← [{from_agent}]: {message_content}")
+            logger.info("📨 [%s] ← [%s]: %s", self.agent_id, from_agent, message_content)
             
-            # Check if this is a reply (don't respond to replies to avoid infinite loops)
-            if message_content.startswith("Response to "):
-                logger.info(f"🔄 [{self.agent_id}] Received reply from {from_agent}, displaying to user")
+            # Check if this is a reply (don't respond to replies to avoid infinite loops).
+            # Replies are tagged message_type='agent_reply'; untagged replies from older
+            # bridges are still recognized by their "Response to <our id>: " prefix.
+            custom_fields = msg.metadata.custom_fields if msg.metadata else None
+            is_reply = bool(custom_fields) and custom_fields.get('message_type') == 'agent_reply'
+            if not is_reply and message_content.startswith(self._legacy_reply_prefix):
+                message_content = message_content[len(self._legacy_reply_prefix):]
+                is_reply = True
+            if is_reply:
+                logger.info("🔄 [%s] Received reply from %s, displaying to user", self.agent_id, from_agent)
                 # Display the reply to user but don't respond back to avoid loops
-                return self._create_response(
-                    msg, conversation_id, 
-                    f"[{from_agent}] {message_content[len('Response to ' + self.agent_id + ': '):]}"
-                )
+                return self._create_response(msg, conversation_id, f"[{from_agent}] {message_content}")
             
             # Process the message through our agent logic
-            if self.telemetry:
-                self.telemetry.log_message_received(self.agent_id, conversation_id)
+            self._telemetry_enqueue(("message_received", self.agent_id, conversation_id))
             
             response = self.agent_logic(message_content, conversation_id)
             
-            # Send response back
+            # Send response back, tagged so the receiver treats it as a reply
             return self._create_response(
                 msg, conversation_id, 
-                f"Response to {from_agent}: {response}"
+                f"Response to {from_agent}: {response}",
+                metadata=Metadata(custom_fields={
+                    'from_agent_id': self.agent_id,
+                    'to_agent_id': from_agent,
+                    'message_type': 'agent_reply',
+                    'reply_to': self.agent_id
+                })
             )
             
         except Exception as e:
@@ -120,39 +274,66 @@ class SimpleAgentBridge(A2AServer):
 
     def _handle_agent_message(self, user_text: str, msg: Message, conversation_id: str) -> Message:
         """Handle messages to other agents (@agent_id message)"""
-        parts = user_text.split(" ", 1)
-        if len(parts) <= 1:
+        head, sep, message_text = user_text.partition(" ")
+        if not sep:
             return self._create_response(
                 msg, conversation_id,
                 "Invalid format. Use '@agent_id message'"
             )
         
-        target_agent = parts[0][1:]  # Remove @
-        message_text = parts[1]
+        target_agent = head[1:]  # Remove @
         
-        logger.info(f"🔄 [{self.agent_id}] Sending to {target_agent}: {message_text}")
+        logger.info("🔄 [%s] Sending to %s: %s", self.agent_id, target_agent, message_text)
+        
+        if self._outbound is not None:
+            self._outbound.submit(self._send_and_store_reply, target_agent, message_text, conversation_id)
+            # Replies are kept per conversation, so tell the user which one to fetch
+            # them from (the id may have just been generated for this message)
+            return self._create_response(
+                msg, conversation_id,
+                f"Message to {target_agent} acknowledged, use /replies in conversation "
+                f"{conversation_id} to fetch the reply"
+            )
         
         # Look up target agent and send message
         result = self._send_to_agent(target_agent, message_text, conversation_id)
         return self._create_response(msg, conversation_id, result)
+
+    def _send_and_store_reply(self, target_agent_id: str, message_text: str, conversation_id: str):
+        """Send a message in the background and hold the reply for /replies"""
+        result = self._send_to_agent(target_agent_id, message_text, conversation_id)
+        with self._replies_lock:
+            replies = self._pending_replies.get(conversation_id)
+            if replies is None:
+                replies = self._pending_replies[conversation_id] = deque(maxlen=PENDING_REPLY_MAX_PER_CONVERSATION)
+            replies.append(result)
+            self._pending_replies.move_to_end(conversation_id)
+            while len(self._pending_replies) > PENDING_REPLY_MAX_CONVERSATIONS:
+                self._pending_replies.popitem(last=False)
+
+    def _take_replies(self, conversation_id: str) -> str:
+        """Pop the replies received so far for a conversation"""
+        with self._replies_lock:
+            replies = self._pending_replies.pop(conversation_id, None)
+        if not replies:
+            return "No pending replies"
+        return "\n".join(replies)
     
     def _handle_command(self, user_text: str, msg: Message, conversation_id: str) -> Message:
         """Handle system commands"""
-        parts = user_text.split(" ", 1)
-        command = parts[0][1:] if len(parts) > 0 else ""
-        args = parts[1] if len(parts) > 1 else ""
+        head, _, args = user_text.partition(" ")
+        command = head[1:]
         
         if command == "help":
-            help_text = """Available commands:
-/help - Show this help
-/ping - Test agent responsiveness  
-/status - Show agent status
-@agent_id message - Send message to another agent"""
+            help_text = _HELP_TEXT if self._outbound is None else _ASYNC_HELP_TEXT
             return self._create_response(msg, conversation_id, help_text)
         
         elif command == "ping":
             return self._create_response(msg, conversation_id, "Pong!")
         
+        elif command == "replies" and self._outbound is not None:
+            return self._create_response(msg, conversation_id, self._take_replies(conversation_id))
+        
         elif command == "status":
             status = f"Agent: {self.agent_id}, Status: Running"
             if self.registry_url:
@@ -177,83 +358,125 @@ class SimpleAgentBridge(A2AServer):
             if not agent_url.endswith('/a2a'):
                 agent_url = f"{agent_url}/a2a"
             
-            logger.info(f"📤 [{self.agent_id}] → [{target_agent_id}]: {message_text}")
+            logger.info("📤 [%s] → [%s]: %s", self.agent_id, target_agent_id, message_text)
             
             # Create simple message with metadata
             simple_message = f"FROM: {self.agent_id}\nTO: {target_agent_id}\nMESSAGE: {message_text}"
             
             # Send message using A2A client
-            client = A2AClient(agent_url, timeout=30)
+            client = self._get_a2a_client(agent_url)
             response = client.send_message(
                 Message(
                     role=MessageRole.USER,
                     content=TextContent(text=simple_message),
                     conversation_id=conversation_id,
-                    metadata=Metadata(custom_fields={
-                        'from_agent_id': self.agent_id,
-                        'to_agent_id': target_agent_id,
-                        'message_type': 'agent_to_agent'
-                    })
+                    # Fresh Metadata per message: it stamps its own created_at
+                    metadata=Metadata(custom_fields=self._get_metadata_fields(target_agent_id))
                 )
             )
             
-            if self.telemetry:
-                self.telemetry.log_agent_message_sent(self.agent_id, target_agent_id, conversation_id)
+            self._telemetry_enqueue(("message_sent", target_agent_id, conversation_id))
             
             # Extract the actual response content from the target agent
-            logger.info(f"🔍 [{self.agent_id}] Response type: {type(response)}, has parts: {hasattr(response, 'parts') if response else 'None'}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🔍 [%s] Response type: %s, has parts: %s", self.agent_id, type(response),
+                            hasattr(response, 'parts') if response else 'None')
             if response:
                 if hasattr(response, 'parts') and response.parts:
                     response_text = response.parts[0].text
-                    logger.info(f"✅ [{self.agent_id}] Received response from {target_agent_id}: {response_text[:100]}...")
+                    logger.info("✅ [%s] Received response from %s: %.100s...", self.agent_id, target_agent_id, response_text)
                     return f"[{target_agent_id}] {response_text}"
                 else:
-                    logger.info(f"✅ [{self.agent_id}] Response has no parts, full response: {str(response)[:200]}...")
+                    logger.info("✅ [%s] Response has no parts, full response: %.200s...", self.agent_id, response)
                     return f"[{target_agent_id}] {str(response)}"
             else:
-                logger.info(f"✅ [{self.agent_id}] Message delivered to {target_agent_id}, no response")
+                logger.info("✅ [%s] Message delivered to %s, no response", self.agent_id, target_agent_id)
                 return f"Message sent to {target_agent_id}: {message_text}"
             
         except Exception as e:
             return f"❌ Error sending to {target_agent_id}: {str(e)}"
     
+    def _get_a2a_client(self, agent_url: str) -> A2AClient:
+        """Get the cached A2A client for an agent URL, creating it on first use"""
+        with self._client_lock:
+            client = self._a2a_clients.get(agent_url)
+            if client is not None:
+                self._a2a_clients.move_to_end(agent_url)
+                return client
+
+        # Built outside the lock: A2AClient fetches the agent card over the network
+        client = A2AClient(agent_url, timeout=30)
+        with self._client_lock:
+            return _lru_store(self._a2a_clients, agent_url, client)
+
+    def _get_metadata_fields(self, target_agent_id: str) -> Dict[str, str]:
+        """Get the cached agent-to-agent metadata fields for a target agent"""
+        with self._metadata_lock:
+            fields = self._metadata_fields.get(target_agent_id)
+            if fields is None:
+                fields = {
+                    'from_agent_id': self.agent_id,
+                    'to_agent_id': target_agent_id,
+                    'message_type': 'agent_to_agent'
+                }
+            return _lru_store(self._metadata_fields, target_agent_id, fields)
+
+    def _telemetry_enqueue(self, event: Tuple):
+        """Hand a telemetry event to the background shipper, if telemetry is enabled"""
+        if self._telemetry_shipper:
+            self._telemetry_shipper.enqueue(event)
+
     def _lookup_agent(self, agent_id: str) -> Optional[str]:
+        """Look up agent URL, serving recent results from the TTL cache"""
+        now = time.monotonic()
+        with self._lookup_lock:
+            entry = self._lookup_cache.get(agent_id)
+            if entry:
+                ttl = self._lookup_ttl if entry[1] else LOOKUP_NEGATIVE_TTL
+                if now - entry[0] < ttl:
+                    self._lookup_cache.move_to_end(agent_id)
+                    return entry[1]
+
+        agent_url = self._resolve_agent(agent_id)
+
+        with self._lookup_lock:
+            self._lookup_cache[agent_id] = (now, agent_url)
+            self._lookup_cache.move_to_end(agent_id)
+            while len(self._lookup_cache) > LOOKUP_CACHE_MAX_SIZE:
+                self._lookup_cache.popitem(last=False)
+
+        return agent_url
+
+    def _resolve_agent(self, agent_id: str) -> Optional[str]:
         """Look up agent URL in registry or use local discovery"""
         
         # Try registry lookup if available
         if self.registry_url:
             try:
-                response = requests.get(f"{self.registry_url}/lookup/{agent_id}", timeout=10)
+                response = self._http.get(f"{self.registry_url}/lookup/{agent_id}", timeout=10)
                 if response.status_code == 200:
                     data = response.json()
                     agent_url = data.get("agent_url")
-                    logger.info(f"🌐 Found {agent_id} in registry: {agent_url}")
+                    logger.info("🌐 Found %s in registry: %s", agent_id, agent_url)
                     return agent_url
             except Exception as e:
                 logger.warning(f"🌐 Registry lookup failed: {e}")
         
         # Fallback to local discovery (for testing)
-        local_agents = {
-            "test_agent": "http://localhost:6000",
-            "pirate_agent": "http://localhost:6001", 
-            "helpful_agent": "http://localhost:6002",
-            "echo_agent": "http://localhost:6003",
-            "simple_test_agent": "http://localhost:6005",
-            "agent_alpha": "http://localhost:6010",
-            "agent_beta": "http://localhost:6011"
-        }
-        
-        if agent_id in local_agents:
-            logger.info(f"🏠 Found {agent_id} locally: {local_agents[agent_id]}")
-            return local_agents[agent_id]
+        agent_url = _LOCAL_AGENT_REGISTRY.get(agent_id)
+        if agent_url:
+            logger.info("🏠 Found %s locally: %s", agent_id, agent_url)
+            return agent_url
         
         return None
     
-    def _create_response(self, original_msg: Message, conversation_id: str, text: str) -> Message:
+    def _create_response(self, original_msg: Message, conversation_id: str, text: str,
+                         metadata: Optional[Metadata] = None) -> Message:
         """Create a response message"""
         return Message(
             role=MessageRole.AGENT,
-            content=TextContent(text=f"[{self.agent_id}] {text}"),
+            content=TextContent(text=self._reply_prefix + text),
             parent_message_id=original_msg.message_id,
-            conversation_id=conversation_id
+            conversation_id=conversation_id,
+            metadata=metadata
         )
@@ -4,30 +4,134 @@ Registry Client for Nanda Index Registry Integration
 Handles agent registration, discovery, and management
 """
 
-import requests
 import json
-import os
-from typing import Optional, Dict, List, Any
+import time
+import atexit
+import threading
+import functools
+import weakref
+import urllib3
+from typing import Optional, Dict, List, Any, Callable, Tuple
+from collections import deque
 from datetime import datetime
+from ..utils.http import create_http_session
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Status update batching settings
+STATUS_FLUSH_INTERVAL = 1.0
+STATUS_FLUSH_BATCH_SIZE = 100
+STATUS_BUFFER_MAX_SIZE = 10000
+STATUS_REQUEST_TIMEOUT = 10.0
+STATUS_CLOSE_TIMEOUT = 5.0  # Upper bound on close(), including the final flush
+
+# Cached health/stats probe settings
+HEALTH_PROBE_INTERVAL = 2.0
+HEALTH_CACHE_TTL = 5.0
+STATS_CACHE_TTL = 30.0
+STATS_REFRESH_INTERVAL = 15.0
+
+
+@functools.lru_cache(maxsize=None)
+def _default_registry_url() -> str:
+    """Read the default registry URL from registry_url.txt once per process"""
+    try:
+        with open("registry_url.txt", "r") as f:
+            return f.read().strip()
+    except Exception:
+        pass
+    return "https://registry.chat39.com"
+
+
+def _request_timeout(deadline: Optional[float]) -> float:
+    """Per-request timeout for status updates, capped by an overall deadline"""
+    if deadline is None:
+        return STATUS_REQUEST_TIMEOUT
+    return max(0.001, min(STATUS_REQUEST_TIMEOUT, deadline - time.monotonic()))
+
+
+def _status_flush_loop(client_ref: "weakref.ref", flush_event: threading.Event, stop: threading.Event):
+    """Flush a client's buffered status updates every interval or when the batch fills up,
+    until stopped or the client is garbage collected"""
+    while not stop.is_set():
+        flush_event.wait(STATUS_FLUSH_INTERVAL)
+        flush_event.clear()
+        client = client_ref()
+        if client is None or stop.is_set():
+            return
+        client.flush_status_updates()
+        del client
+
+
+def _is_transient_status(status_code: int) -> bool:
+    """Whether a failed registry response is worth retrying (rate limit or server error)"""
+    return status_code == 429 or status_code >= 500
+
+
+def _build_predicate(query: str = "", capabilities: List[str] = None,
+                     tags: List[str] = None) -> Callable[[Dict[str, Any]], bool]:
+    """Build an agent filter matching the registry's search semantics"""
+    # Normalize the criteria once rather than per agent
+    q = query.lower() if query else None
+    caps_set = frozenset(capabilities) if capabilities else None
+    tags_set = frozenset(tags) if tags else None
+
+    def predicate(agent: Dict[str, Any]) -> bool:
+        # Simple text matching for query
+        if q and q not in ((agent.get('agent_id') or '') + ' ' + (agent.get('description') or '')).lower():
+            return False
+
+        # Capability matching
+        if caps_set and caps_set.isdisjoint(agent.get('capabilities') or ()):
+            return False
+
+        # Tag matching
+        if tags_set and tags_set.isdisjoint(agent.get('tags') or ()):
+            return False
+
+        return True
+
+    return predicate
 
 
 class RegistryClient:
     """Client for interacting with the Nanda index registry"""
 
-    def __init__(self, registry_url: Optional[str] = None):
+    def __init__(self, registry_url: Optional[str] = None, ca_bundle: Optional[str] = None,
+                 verify_ssl: bool = True):
         self.registry_url = registry_url or self._get_default_registry_url()
-        self.session = requests.Session()
-        self.session.verify = False  # For development with self-signed certs
+        self.session = create_http_session()
+        if verify_ssl:
+            self.session.verify = ca_bundle or True
+        else:
+            # For development with self-signed certs; silence urllib3's per-request warning
+            self.session.verify = False
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        # Buffered status updates, flushed by a background thread
+        self._status_buffer: deque = deque()
+        self._status_lock = threading.Lock()
+        self._status_flush_event = threading.Event()
+        self._status_stop = threading.Event()
+        self._status_thread: Optional[threading.Thread] = None
+        self._bulk_status_supported = True
+        self._batch_search_supported = True
+        self.buffer_discarded_events_total = 0
+        self._last_seen_cache: Tuple[int, str] = (0, "")
+
+        # (checked_at, value) caches kept fresh by a background probe thread
+        self._health_cache: Optional[Tuple[float, bool]] = None
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._health_thread: Optional[threading.Thread] = None
+        self._health_stop = threading.Event()
+        self._health_lock = threading.Lock()
 
     def _get_default_registry_url(self) -> str:
         """Get default registry URL from configuration"""
-        try:
-            if os.path.exists("registry_url.txt"):
-                with open("registry_url.txt", "r") as f:
-                    return f.read().strip()
-        except Exception:
-            pass
-        return "https://registry.chat39.com"
+        return _default_registry_url()
 
     def register_agent(self, agent_id: str, agent_url: str, api_url: Optional[str] = None, agent_facts_url: Optional[str] = None) -> bool:
         """Register an agent with the registry"""
@@ -58,13 +162,25 @@ class RegistryClient:
             print(f"Error looking up agent {agent_id}: {e}")
             return None
 
-    def list_agents(self) -> List[Dict[str, Any]]:
-        """List all registered agents"""
+    def list_agents(self, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """List all registered agents, optionally keeping only those matching predicate"""
         try:
-            response = self.session.get(f"{self.registry_url}/list")
-            if response.status_code == 200:
-                return response.json()
-            return []
+            if predicate is None:
+                response = self.session.get(f"{self.registry_url}/list")
+                if response.status_code == 200:
+                    return response.json()
+                return []
+
+            # Stream and filter in one pass so only matching agents are materialized
+            with self.session.get(f"{self.registry_url}/list", stream=True) as response:
+                if response.status_code != 200:
+                    return []
+                if ijson is None:
+                    return [agent for agent in response.json() if predicate(agent)]
+                response.raw.decode_content = True
+                # use_float keeps numbers as floats, matching response.json() (not Decimal)
+                agents = ijson.items(response.raw, 'item', use_float=True)
+                return [agent for agent in agents if predicate(agent)]
         except Exception as e:
             print(f"Error listing agents: {e}")
             return []
@@ -119,33 +235,28 @@ class RegistryClient:
             print(f"Error searching agents: {e}")
             return self._filter_agents_locally(query, capabilities, tags)
 
+    def search_agents_multi(self, queries: List[Dict[str, Any]]) -> Optional[List[List[Dict[str, Any]]]]:
+        """Run several searches (each a dict of search_agents arguments) in one request.
+        Returns None when the registry has no batch endpoint, so callers can fall back."""
+        if not self._batch_search_supported:
+            return None
+        try:
+            response = self.session.post(f"{self.registry_url}/search/batch", json={"queries": queries})
+            if response.status_code == 200:
+                results = response.json()
+                if isinstance(results, list) and len(results) == len(queries):
+                    return results
+                return None
+            if response.status_code in (404, 405):
+                self._batch_search_supported = False
+            return None
+        except Exception as e:
+            print(f"Error in batch agent search: {e}")
+            return None
+
     def _filter_agents_locally(self, query: str = "", capabilities: List[str] = None, tags: List[str] = None) -> List[Dict[str, Any]]:
         """Fallback local filtering when server search is not available"""
-        all_agents = self.list_agents()
-        filtered = []
-
-        for agent in all_agents:
-            # Simple text matching for query
-            if query:
-                agent_text = f"{agent.get('agent_id', '')} {agent.get('description', '')}"
-                if query.lower() not in agent_text.lower():
-                    continue
-
-            # Capability matching
-            if capabilities:
-                agent_caps = agent.get('capabilities', [])
-                if not any(cap in agent_caps for cap in capabilities):
-                    continue
-
-            # Tag matching
-            if tags:
-                agent_tags = agent.get('tags', [])
-                if not any(tag in agent_tags for tag in tags):
-                    continue
-
-            filtered.append(agent)
-
-        return filtered
+        return self.list_agents(predicate=_build_predicate(query, capabilities, tags))
 
     def get_mcp_servers(self, registry_provider: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get list of available MCP servers"""
@@ -186,21 +297,118 @@ class RegistryClient:
             return None
 
     def update_agent_status(self, agent_id: str, status: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Update agent status and metadata"""
-        try:
-            data = {
-                "agent_id": agent_id,
-                "status": status,
-                "last_seen": datetime.now().isoformat()
-            }
-            if metadata:
-                data.update(metadata)
+        """Queue an agent status update; updates are sent to the registry in batches"""
+        data = {
+            "agent_id": agent_id,
+            "status": status,
+            "last_seen": self._last_seen_timestamp()
+        }
+        if metadata:
+            data.update(metadata)
 
-            response = self.session.put(f"{self.registry_url}/agents/{agent_id}/status", json=data)
-            return response.status_code == 200
+        with self._status_lock:
+            if len(self._status_buffer) >= STATUS_BUFFER_MAX_SIZE:
+                self._status_buffer.popleft()
+                self.buffer_discarded_events_total += 1
+            self._status_buffer.append(data)
+            buffered = len(self._status_buffer)
+            if self._status_thread is None:
+                # The thread only holds a weak reference, so it doesn't keep this client alive
+                self._status_stop = threading.Event()
+                self._status_thread = threading.Thread(
+                    target=_status_flush_loop,
+                    args=(weakref.ref(self), self._status_flush_event, self._status_stop),
+                    daemon=True
+                )
+                self._status_thread.start()
+                # The flush thread is a daemon, so send what's left when the interpreter exits
+                _OPEN_CLIENTS.add(self)
+
+        if buffered >= STATUS_FLUSH_BATCH_SIZE:
+            self._status_flush_event.set()
+        return True
+
+    def _last_seen_timestamp(self) -> str:
+        """ISO-8601 timestamp at one-second resolution, formatted once per second"""
+        now_sec = int(time.time())
+        cached_sec, cached_iso = self._last_seen_cache
+        if cached_sec != now_sec:
+            cached_iso = datetime.fromtimestamp(now_sec).isoformat()
+            self._last_seen_cache = (now_sec, cached_iso)
+        return cached_iso
+
+    def flush_status_updates(self, timeout: Optional[float] = None) -> bool:
+        """Send all buffered status updates to the registry now, giving up after timeout seconds"""
+        with self._status_lock:
+            batch = list(self._status_buffer)
+            self._status_buffer.clear()
+        if not batch:
+            return True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        ok, retry = self._send_status_batch(batch, deadline)
+        if retry:
+            self._requeue_status_updates(retry)
+        return ok
+
+    def _send_status_batch(self, batch: List[Dict[str, Any]],
+                           deadline: Optional[float] = None) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Send status updates; returns (all succeeded, updates that failed transiently and should be retried)"""
+        try:
+            if self._bulk_status_supported:
+                response = self.session.post(f"{self.registry_url}/agents/bulk_status", json=batch,
+                                             timeout=_request_timeout(deadline))
+                if response.status_code == 200:
+                    return True, []
+                if response.status_code not in (404, 405):
+                    return False, batch if _is_transient_status(response.status_code) else []
+                # Server has no bulk endpoint; fall back to per-agent updates from now on
+                self._bulk_status_supported = False
         except Exception as e:
             print(f"Error updating agent status: {e}")
-            return False
+            return False, batch
+
+        ok = True
+        retry = []
+        for i, data in enumerate(batch):
+            try:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError("status flush timed out")
+                response = self.session.put(f"{self.registry_url}/agents/{data['agent_id']}/status", json=data,
+                                            timeout=_request_timeout(deadline))
+            except Exception as e:
+                print(f"Error updating agent status: {e}")
+                return False, retry + batch[i:]
+            if response.status_code != 200:
+                ok = False
+                if _is_transient_status(response.status_code):
+                    retry.append(data)
+        return ok, retry
+
+    def _requeue_status_updates(self, updates: List[Dict[str, Any]]):
+        """Put failed updates back at the front of the buffer, oldest first, within its size limit"""
+        with self._status_lock:
+            room = max(0, STATUS_BUFFER_MAX_SIZE - len(self._status_buffer))
+            if len(updates) > room:
+                self.buffer_discarded_events_total += len(updates) - room
+                updates = updates[len(updates) - room:]
+            self._status_buffer.extendleft(reversed(updates))
+
+    def close(self, timeout: float = STATUS_CLOSE_TIMEOUT):
+        """Stop the background threads and flush any buffered status updates, within timeout seconds"""
+        deadline = time.monotonic() + timeout
+        self.stop_health_monitor()
+
+        with self._status_lock:
+            thread, stop = self._status_thread, self._status_stop
+            self._status_thread = None
+        if thread is not None:
+            stop.set()
+            self._status_flush_event.set()
+            thread.join(timeout)
+        _OPEN_CLIENTS.discard(self)
+
+        self.flush_status_updates(timeout=max(0.0, deadline - time.monotonic()))
 
     def unregister_agent(self, agent_id: str) -> bool:
         """Unregister an agent from the registry"""
@@ -212,20 +420,83 @@ class RegistryClient:
             return False
 
     def health_check(self) -> bool:
-        """Check if the registry is healthy"""
+        """Check if the registry is healthy, using the background probe result when fresh"""
+        self._start_health_monitor()
+
+        cached = self._health_cache
+        if cached and time.monotonic() - cached[0] < HEALTH_CACHE_TTL:
+            return cached[1]
+        return self._probe_health()
+
+    def _start_health_monitor(self):
+        """Start the background health/stats probe thread if it isn't running"""
+        if self._health_thread is not None:
+            return
+        with self._health_lock:
+            if self._health_thread is None:
+                # A fresh stop event per thread, so a stopped thread can't be revived by a restart
+                self._health_stop = threading.Event()
+                self._health_thread = threading.Thread(target=self._health_loop, args=(self._health_stop,),
+                                                       daemon=True)
+                self._health_thread.start()
+
+    def stop_health_monitor(self):
+        """Stop the background health probe thread; the next health_check restarts it"""
+        with self._health_lock:
+            self._health_stop.set()
+            self._health_thread = None
+
+    def _probe_health(self) -> bool:
+        """Probe the registry health endpoint and cache the result"""
         try:
             response = self.session.get(f"{self.registry_url}/health", timeout=5)
-            return response.status_code == 200
+            healthy = response.status_code == 200
         except Exception:
-            return False
+            healthy = False
+        self._health_cache = (time.monotonic(), healthy)
+        return healthy
+
+    def _health_loop(self, stop: threading.Event):
+        """Re-probe registry health, and refresh stats once they've been requested, until stopped"""
+        while not stop.wait(HEALTH_PROBE_INTERVAL):
+            self._probe_health()
+            stats = self._stats_cache
+            if stats and time.monotonic() - stats[0] >= STATS_REFRESH_INTERVAL:
+                self._fetch_stats()
 
     def get_registry_stats(self) -> Optional[Dict[str, Any]]:
-        """Get registry statistics"""
+        """Get registry statistics, kept fresh in the background after the first request"""
+        self._start_health_monitor()
+
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < STATS_CACHE_TTL:
+            return cached[1]
+        return self._fetch_stats()
+
+    def _fetch_stats(self) -> Optional[Dict[str, Any]]:
+        """Fetch registry statistics and cache successful results"""
         try:
             response = self.session.get(f"{self.registry_url}/stats")
             if response.status_code == 200:
-                return response.json()
+                stats = response.json()
+                self._stats_cache = (time.monotonic(), stats)
+                return stats
             return None
         except Exception as e:
             print(f"Error getting registry stats: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+# Clients with a running status flush thread, flushed once at interpreter exit
+_OPEN_CLIENTS: "weakref.WeakSet[RegistryClient]" = weakref.WeakSet()
+
+
+def _close_open_clients():
+    """Close every live client so buffered status updates are sent before exit,
+    all within STATUS_CLOSE_TIMEOUT so an unreachable registry can't hang shutdown"""
+    deadline = time.monotonic() + STATUS_CLOSE_TIMEOUT
+    for client in list(_OPEN_CLIENTS):
+        client.close(timeout=max(0.0, deadline - time.monotonic()))
+
+
+atexit.register(_close_open_clients)
@@ -3,12 +3,38 @@
 Agent Discovery System - Intelligent search and recommendation for the agent ecosystem
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import io
+import re
+import time
+import threading
+from time import perf_counter
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Any, Optional, Tuple, Set
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from .task_analyzer import TaskAnalyzer, TaskAnalysis
-from .agent_ranker import AgentRanker, AgentScore
+from .agent_ranker import AgentRanker, AgentScore, AgentView, normalize_agent
 from ..core.registry_client import RegistryClient
 
+# Registry search/metadata cache settings
+SEARCH_CACHE_MAX_SIZE = 512
+SEARCH_CACHE_TTL = 60.0
+_CACHE_MISS = object()
+
+# Ranked candidates kept for recommendation filtering (score/confidence thresholds)
+RANK_CANDIDATE_LIMIT = 256
+
+# Agent catalog index settings
+CATALOG_REFRESH_INTERVAL = 300.0
+_TOKEN_RE = re.compile(r"\w+")
+
+# Suggestions depend only on a few categorical task/result features, so cache them by those
+SUGGESTION_CACHE_MAX_SIZE = 1024
+_SUGGESTION_CACHE: Dict[tuple, Tuple[str, ...]] = {}
+
+# Per-agent block of explain_recommendations: index, agent_id, score, confidence
+_AGENT_EXPLANATION = "\n\n{0}. Agent: {1}\n   Score: {2:.2f}\n   Confidence: {3:.2f}"
+
 
 @dataclass
 class DiscoveryResult:
@@ -20,6 +46,77 @@ class DiscoveryResult:
     suggestions: List[str]
 
 
+@dataclass
+class CatalogIndex:
+    """Inverted indices over the registry's agent catalog, keyed by agent_id
+    (by catalog position for agents without one)"""
+    agents: Dict[Any, Dict[str, Any]] = field(default_factory=dict)
+    views: Dict[Any, AgentView] = field(default_factory=dict)  # normalized once per build
+    positions: Dict[Any, int] = field(default_factory=dict)
+    capabilities: Dict[str, Set[Any]] = field(default_factory=dict)
+    domains: Dict[str, Set[Any]] = field(default_factory=dict)
+    keywords: Dict[str, Set[Any]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, agents: List[Dict[str, Any]]) -> "CatalogIndex":
+        """Index agents by capability, domain and keyword token"""
+        index = cls()
+        capabilities = defaultdict(set)
+        domains = defaultdict(set)
+        keywords = defaultdict(set)
+
+        for agent in agents:
+            agent_id = agent.get("agent_id") or ""
+            if agent_id in index.agents:
+                continue
+            # Agents without an agent_id are kept (as the registry search path does), keyed
+            # by position; an int key can't collide with a real id
+            key = agent_id or len(index.agents)
+            index.positions[key] = len(index.agents)
+            index.agents[key] = agent
+            index.views[key] = normalize_agent(agent)
+
+            for cap in agent.get("capabilities") or ():
+                capabilities[cap].add(key)
+            domain = (agent.get("domain") or "").lower()
+            if domain:
+                domains[domain].add(key)
+
+            text = f"{agent_id} {agent.get('description') or ''} {' '.join(agent.get('keywords') or ())}"
+            for token in _TOKEN_RE.findall(text.lower()):
+                keywords[token].add(key)
+
+        index.capabilities = dict(capabilities)
+        index.domains = dict(domains)
+        index.keywords = dict(keywords)
+        return index
+
+    def lookup(self, task_analysis: TaskAnalysis) -> List[Dict[str, Any]]:
+        """Agents matching any required capability, the domain, or a top keyword, in catalog order"""
+        ids: Set[Any] = set()
+
+        for cap in task_analysis.required_capabilities:
+            ids |= self.capabilities.get(cap, set())
+
+        if task_analysis.domain and task_analysis.domain != "general":
+            domain = task_analysis.domain.lower()
+            ids |= self.domains.get(domain, set())
+            ids |= self.keywords.get(domain, set())
+
+        for keyword in task_analysis.keywords[:3]:  # Top 3 keywords
+            ids |= self.keywords.get(keyword.lower(), set())
+
+        return [self.agents[agent_id] for agent_id in sorted(ids, key=self.positions.__getitem__)]
+
+    def views_for(self, agents: List[Dict[str, Any]]) -> List[Optional[AgentView]]:
+        """Precomputed views for agents taken from this catalog, None for any that weren't"""
+        views = []
+        for agent in agents:
+            agent_id = agent.get("agent_id")
+            views.append(self.views[agent_id] if self.agents.get(agent_id) is agent else None)
+        return views
+
+
 class AgentDiscovery:
     """Main discovery system that coordinates task analysis and agent ranking"""
 
@@ -28,24 +125,38 @@ class AgentDiscovery:
         self.task_analyzer = TaskAnalyzer()
         self.agent_ranker = AgentRanker()
         self.performance_cache = {}
+        # Runs the independent registry searches of a discovery concurrently
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nanda-discovery")
+        # Registry responses keyed by canonicalized arguments: key -> (fetched_at, result)
+        self._search_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # Catalog indices, loaded on first discovery and refreshed in the background
+        self._catalog_index: Optional[CatalogIndex] = None
+        self._catalog_lock = threading.Lock()
+        self._catalog_stop = threading.Event()
+        self._catalog_failed_at: Optional[float] = None  # monotonic time of last failed load
 
     def discover_agents(self, task_description: str, limit: int = 5,
                        min_score: float = 0.3, filters: Dict[str, Any] = None) -> DiscoveryResult:
         """Main entry point for agent discovery"""
-        import time
-        start_time = time.time()
+        start_time = perf_counter()
 
         # Analyze the task
         task_analysis = self.task_analyzer.analyze_task(task_description)
 
-        # Get available agents
+        # Get available agents, with their normalized views when they came from the catalog
+        catalog = self._get_catalog_index()
         agents = self._get_relevant_agents(task_analysis, filters)
+        views = catalog.views_for(agents) if catalog is not None else None
 
         # Get performance data
         performance_data = self._get_performance_data()
 
         # Rank agents
-        agent_scores = self.agent_ranker.rank_agents(agents, task_analysis, performance_data)
+        agent_scores = self.agent_ranker.rank_agents(
+            agents, task_analysis, performance_data,
+            limit=max(limit, RANK_CANDIDATE_LIMIT), views=views
+        )
 
         # Get top recommendations
         recommendations = self.agent_ranker.get_top_recommendations(
@@ -55,7 +166,7 @@ class AgentDiscovery:
         # Generate suggestions
         suggestions = self._generate_suggestions(task_analysis, recommendations)
 
-        search_time = time.time() - start_time
+        search_time = perf_counter() - start_time
 
         return DiscoveryResult(
             task_analysis=task_analysis,
@@ -80,37 +191,99 @@ class AgentDiscovery:
 
     def get_agent_details(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific agent"""
-        return self.registry_client.get_agent_metadata(agent_id)
+        return self._cached_call(("meta", agent_id), self.registry_client.get_agent_metadata, agent_id)
+
+    def _search_many(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Run several registry searches, serving cached ones and batching the rest"""
+        results: List[Any] = [None] * len(queries)
+        misses = []
+        for i, search in enumerate(queries):
+            cached = self._cache_get(self._search_key(search))
+            if cached is _CACHE_MISS:
+                misses.append(i)
+            else:
+                results[i] = cached
+
+        if misses:
+            pending = [queries[i] for i in misses]
+            fetched = self.registry_client.search_agents_multi(pending) if len(pending) > 1 else None
+            if fetched is None:
+                # No batch endpoint; overlap the individual searches instead
+                futures = [self._pool.submit(self.registry_client.search_agents, **search) for search in pending]
+                fetched = [future.result() for future in futures]
+
+            for i, result in zip(misses, fetched):
+                results[i] = result
+                self._cache_put(self._search_key(queries[i]), result)
+
+        return results
+
+    @staticmethod
+    def _search_key(search: Dict[str, Any]) -> Tuple:
+        """Canonical cache key for a search_agents argument dict"""
+        return (tuple(sorted(search.get("capabilities") or ())), search.get("query", ""))
+
+    def _cached_call(self, key: Tuple, fn, *args, **kwargs) -> Any:
+        """Return a fresh cached result for key, or call fn and cache its result"""
+        result = self._cache_get(key)
+        if result is _CACHE_MISS:
+            result = fn(*args, **kwargs)
+            self._cache_put(key, result)
+        return result
+
+    def _cache_get(self, key: Tuple) -> Any:
+        """Look up a fresh cache entry, returning _CACHE_MISS if absent or expired"""
+        with self._search_cache_lock:
+            entry = self._search_cache.get(key)
+            if entry and time.monotonic() - entry[0] < SEARCH_CACHE_TTL:
+                self._search_cache.move_to_end(key)
+                return entry[1]
+        return _CACHE_MISS
+
+    def _cache_put(self, key: Tuple, value: Any):
+        """Store a cache entry, evicting the least recently used beyond the size limit"""
+        with self._search_cache_lock:
+            self._search_cache[key] = (time.monotonic(), value)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > SEARCH_CACHE_MAX_SIZE:
+                self._search_cache.popitem(last=False)
 
     def _get_relevant_agents(self, task_analysis: TaskAnalysis,
                            filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Get agents relevant to the task"""
 
-        # Start with capability-based search
-        agents = set()
+        catalog = self._get_catalog_index()
+        if catalog is not None:
+            agent_list = catalog.lookup(task_analysis)
+            if filters:
+                agent_list = self._apply_filters(agent_list, filters)
+            return agent_list or list(catalog.agents.values())
+
+        # No catalog available; ask the registry directly
+        searches = []
 
         # Search by required capabilities
         if task_analysis.required_capabilities:
-            cap_agents = self.registry_client.search_agents(
-                capabilities=task_analysis.required_capabilities
-            )
-            agents.update(tuple(sorted(agent.items())) for agent in cap_agents)
+            searches.append({"capabilities": task_analysis.required_capabilities})
 
         # Search by domain
         if task_analysis.domain and task_analysis.domain != "general":
-            domain_agents = self.registry_client.search_agents(
-                query=task_analysis.domain
-            )
-            agents.update(tuple(sorted(agent.items())) for agent in domain_agents)
+            searches.append({"query": task_analysis.domain})
 
         # Search by keywords
         if task_analysis.keywords:
             keyword_query = " ".join(task_analysis.keywords[:3])  # Top 3 keywords
-            keyword_agents = self.registry_client.search_agents(query=keyword_query)
-            agents.update(tuple(sorted(agent.items())) for agent in keyword_agents)
-
-        # Convert back to list of dictionaries
-        agent_list = [dict(agent) for agent in agents]
+            searches.append({"query": keyword_query})
+
+        # Merge in search order, deduplicating by agent_id (by object for agents without one)
+        seen_ids: Set[Any] = set()
+        agent_list: List[Dict[str, Any]] = []
+        for results in self._search_many(searches):
+            for agent in results:
+                agent_id = agent.get("agent_id") or id(agent)
+                if agent_id not in seen_ids:
+                    seen_ids.add(agent_id)
+                    agent_list.append(agent)
 
         # Apply additional filters
         if filters:
@@ -122,6 +295,43 @@ class AgentDiscovery:
 
         return agent_list
 
+    def _get_catalog_index(self) -> Optional[CatalogIndex]:
+        """Return the catalog index, loading it (and starting background refresh) on first use.
+        After a failed load, retries at most once per CATALOG_REFRESH_INTERVAL."""
+        if self._catalog_index is None and not self._catalog_load_backoff():
+            with self._catalog_lock:
+                if self._catalog_index is None and not self._catalog_load_backoff():
+                    if self._refresh_catalog():
+                        threading.Thread(target=self._catalog_refresh_loop, daemon=True).start()
+                    else:
+                        self._catalog_failed_at = time.monotonic()
+        return self._catalog_index
+
+    def _catalog_load_backoff(self) -> bool:
+        """Whether a catalog load failed too recently to try again"""
+        failed_at = self._catalog_failed_at
+        return failed_at is not None and time.monotonic() - failed_at < CATALOG_REFRESH_INTERVAL
+
+    def _refresh_catalog(self) -> bool:
+        """Rebuild the catalog index from the registry's agent list"""
+        agents = self.registry_client.list_agents()
+        if not agents:
+            return False
+        self._catalog_index = CatalogIndex.build(agents)
+        return True
+
+    def _catalog_refresh_loop(self):
+        """Periodically rebuild the catalog index until stopped"""
+        while not self._catalog_stop.wait(CATALOG_REFRESH_INTERVAL):
+            try:
+                self._refresh_catalog()
+            except Exception as e:
+                print(f"Error refreshing agent catalog: {e}")
+
+    def stop(self):
+        """Stop background catalog refresh"""
+        self._catalog_stop.set()
+
     def _apply_filters(self, agents: List[Dict[str, Any]],
                       filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply additional filters to agent list"""
@@ -141,7 +351,7 @@ class AgentDiscovery:
         if "domain" in filters:
             domain_filter = filters["domain"].lower()
             filtered = [a for a in filtered
-                       if a.get("domain", "").lower() == domain_filter]
+                       if (a.get("domain") or "").lower() == domain_filter]
 
         return filtered
 
@@ -158,6 +368,23 @@ class AgentDiscovery:
     def _generate_suggestions(self, task_analysis: TaskAnalysis,
                             recommendations: List[AgentScore]) -> List[str]:
         """Generate helpful suggestions based on discovery results"""
+        key = (
+            task_analysis.task_type,
+            task_analysis.complexity,
+            task_analysis.domain if not recommendations else None,  # only used with no results
+            min(len(recommendations), 2),  # none / one / several
+            bool(recommendations) and recommendations[0].score < 0.7
+        )
+        suggestions = _SUGGESTION_CACHE.get(key)
+        if suggestions is None:
+            suggestions = tuple(self._build_suggestions(task_analysis, recommendations))
+            if len(_SUGGESTION_CACHE) < SUGGESTION_CACHE_MAX_SIZE:
+                _SUGGESTION_CACHE[key] = suggestions
+        return list(suggestions)
+
+    def _build_suggestions(self, task_analysis: TaskAnalysis,
+                           recommendations: List[AgentScore]) -> List[str]:
+        """Build the suggestion list for a discovery result"""
         suggestions = []
 
         if not recommendations:
@@ -192,50 +419,56 @@ class AgentDiscovery:
 
     def explain_recommendations(self, discovery_result: DiscoveryResult) -> str:
         """Generate detailed explanation of the discovery process and results"""
-        lines = []
+        buf = io.StringIO()
+        write = buf.write
+        analysis = discovery_result.task_analysis
+        recommended = discovery_result.recommended_agents
 
         # Task analysis summary
-        lines.append("=== Task Analysis ===")
-        lines.append(f"Task Type: {discovery_result.task_analysis.task_type}")
-        lines.append(f"Domain: {discovery_result.task_analysis.domain}")
-        lines.append(f"Complexity: {discovery_result.task_analysis.complexity}")
-        lines.append(f"Required Capabilities: {', '.join(discovery_result.task_analysis.required_capabilities)}")
-        lines.append(f"Key Keywords: {', '.join(discovery_result.task_analysis.keywords[:5])}")
-        lines.append(f"Analysis Confidence: {discovery_result.task_analysis.confidence:.2f}")
-        lines.append("")
+        write(
+            "=== Task Analysis ===\n"
+            f"Task Type: {analysis.task_type}\n"
+            f"Domain: {analysis.domain}\n"
+            f"Complexity: {analysis.complexity}\n"
+            f"Required Capabilities: {', '.join(analysis.required_capabilities)}\n"
+            f"Key Keywords: {', '.join(analysis.keywords[:5])}\n"
+            f"Analysis Confidence: {analysis.confidence:.2f}\n"
+            "\n"
+        )
 
         # Search results summary
-        lines.append("=== Search Results ===")
-        lines.append(f"Total Agents Evaluated: {discovery_result.total_agents_evaluated}")
-        lines.append(f"Agents Recommended: {len(discovery_result.recommended_agents)}")
-        lines.append(f"Search Time: {discovery_result.search_time_seconds:.2f} seconds")
-        lines.append("")
+        write(
+            "=== Search Results ===\n"
+            f"Total Agents Evaluated: {discovery_result.total_agents_evaluated}\n"
+            f"Agents Recommended: {len(recommended)}\n"
+            f"Search Time: {discovery_result.search_time_seconds:.2f} seconds\n"
+            "\n"
+        )
 
         # Detailed agent recommendations
-        if discovery_result.recommended_agents:
-            lines.append("=== Recommended Agents ===")
-            for i, agent_score in enumerate(discovery_result.recommended_agents, 1):
-                lines.append(f"\n{i}. Agent: {agent_score.agent_id}")
-                lines.append(f"   Score: {agent_score.score:.2f}")
-                lines.append(f"   Confidence: {agent_score.confidence:.2f}")
+        if recommended:
+            write("=== Recommended Agents ===")
+            for i, agent_score in enumerate(recommended, 1):
+                write(_AGENT_EXPLANATION.format(
+                    i, agent_score.agent_id, agent_score.score, agent_score.confidence))
                 if agent_score.match_reasons:
-                    lines.append("   Match Reasons:")
+                    write("\n   Match Reasons:")
                     for reason in agent_score.match_reasons:
-                        lines.append(f"     - {reason}")
+                        write(f"\n     - {reason}")
         else:
-            lines.append("=== No Agents Found ===")
+            write("=== No Agents Found ===")
 
         # Suggestions
         if discovery_result.suggestions:
-            lines.append("\n=== Suggestions ===")
+            write("\n\n=== Suggestions ===")
             for suggestion in discovery_result.suggestions:
-                lines.append(f"- {suggestion}")
+                write(f"\n- {suggestion}")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     def get_similar_agents(self, agent_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Find agents similar to the given agent"""
-        target_agent = self.registry_client.get_agent_metadata(agent_id)
+        target_agent = self.get_agent_details(agent_id)
         if not target_agent:
             return []
 
@@ -3,10 +3,103 @@
 Agent Ranking System for scoring and recommending agents based on task fit
 """
 
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional, NamedTuple, FrozenSet, Sequence
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 import math
+import heapq
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Score matrix columns: weight key and AgentScore.metadata key for each feature
+_FEATURES = ("capability_match", "domain_match", "keyword_match",
+             "performance", "availability", "load")
+_FEATURE_METADATA = ("capability_score", "domain_score", "keyword_score",
+                     "performance_score", "availability_score", "load_score")
+_AVAILABILITY = _FEATURES.index("availability")
+
+# Below this many task keywords, plain substring checks beat an Aho-Corasick scan
+KEYWORD_AUTOMATON_MIN_KEYWORDS = 3
+
+
+class _TaskContext(NamedTuple):
+    """Task requirements normalized once per ranking"""
+    capabilities: FrozenSet[str]
+    domain: str
+    keywords: FrozenSet[str]
+    keyword_automaton: Any  # ahocorasick.Automaton mapping keyword -> keyword, or None
+
+
+def _keyword_automaton(keywords: FrozenSet[str]) -> Any:
+    """Build an Aho-Corasick automaton over the task keywords, if worthwhile"""
+    if ahocorasick is None or len(keywords) < KEYWORD_AUTOMATON_MIN_KEYWORDS:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def _task_context(task_analysis: Any) -> _TaskContext:
+    """Build the per-ranking task context from a TaskAnalysis"""
+    keywords = frozenset(word.lower() for word in task_analysis.keywords)
+    return _TaskContext(
+        capabilities=frozenset(task_analysis.required_capabilities),
+        domain=task_analysis.domain.lower(),
+        keywords=keywords,
+        keyword_automaton=_keyword_automaton(keywords)
+    )
+
+
+def _parse_last_seen(last_seen: Any) -> Optional[float]:
+    """Parse an ISO-8601 last_seen value to a Unix timestamp, or None if unusable"""
+    if not last_seen:
+        return None
+    try:
+        # Wall-clock time with any offset dropped, compared against local now
+        parsed = datetime.fromisoformat(last_seen.replace('Z', '+00:00'))
+        return parsed.replace(tzinfo=None).timestamp()
+    except Exception:
+        return None
+
+
+class AgentView(NamedTuple):
+    """Normalized fields of an agent dict, as read by the scoring helpers"""
+    domain: str
+    description: str
+    status: str
+    keywords: FrozenSet[str]
+    capabilities: FrozenSet[str]
+    last_seen_ts: Optional[float]
+
+
+def _agent_presence(agent: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    """Normalized status and parsed last_seen of an agent dict, the inputs to availability"""
+    return (agent.get("status") or "unknown").lower(), _parse_last_seen(agent.get("last_seen"))
+
+
+def normalize_agent(agent: Dict[str, Any],
+                    presence: Optional[Tuple[str, Optional[float]]] = None) -> AgentView:
+    """Build the normalized view of an agent dict, leaving the dict itself untouched"""
+    status, last_seen_ts = presence or _agent_presence(agent)
+    return AgentView(
+        domain=(agent.get("domain") or "").lower(),
+        description=(agent.get("description") or "").lower(),
+        status=status,
+        keywords=frozenset(word.lower() for word in agent.get("keywords") or ()),
+        capabilities=frozenset(agent.get("capabilities") or ()),
+        last_seen_ts=last_seen_ts
+    )
 
 
 @dataclass
@@ -33,78 +126,121 @@ class AgentRanker:
             "load": 0.05
         }
 
-    def rank_agents(self, agents: List[Dict[str, Any]], task_analysis: Any,
-                   performance_data: Dict[str, Any] = None) -> List[AgentScore]:
-        """Rank agents based on task requirements"""
-
-        agent_scores = []
-
-        for agent in agents:
-            score_result = self._score_agent(agent, task_analysis, performance_data)
-            agent_scores.append(score_result)
+        self._domain_similarity = self._build_domain_similarity()
 
-        # Sort by score (descending)
-        agent_scores.sort(key=lambda x: x.score, reverse=True)
-
-        return agent_scores
+    def rank_agents(self, agents: List[Dict[str, Any]], task_analysis: Any,
+                   performance_data: Dict[str, Any] = None,
+                   limit: Optional[int] = None,
+                   views: Optional[Sequence[Optional[AgentView]]] = None) -> List[AgentScore]:
+        """Rank agents based on task requirements, optionally keeping only the top `limit`.
+        `views` may give precomputed AgentViews in agent order; missing ones are normalized here."""
+        if not agents:
+            return []
+
+        task = _task_context(task_analysis)
+        if views is None:
+            views = [None] * len(agents)
+
+        # Walk the agents once, collecting one feature row per agent (SoA score matrix)
+        rows = []
+        reasons = []
+        for agent, view in zip(agents, views):
+            match_reasons = []
+            rows.append(self._score_features(agent, task, performance_data, match_reasons, view))
+            reasons.append(match_reasons)
+
+        # Weighted sum of each row; scores are all in [0, 1], so float32 is plenty
+        weights = [self.weights[name] for name in _FEATURES]
+        if np is not None:
+            feats = np.array(rows, dtype=np.float32)
+            weight_vec = np.array(weights, dtype=np.float32)
+            totals = (feats @ weight_vec).tolist()
+        else:
+            totals = [sum(score * weight for score, weight in zip(row, weights)) for row in rows]
+
+        # Descending by score, ties keeping input order; select only the top `limit` when given
+        if limit is not None and limit < len(rows):
+            order = heapq.nlargest(limit, range(len(rows)), key=totals.__getitem__)
+        else:
+            order = sorted(range(len(rows)), key=totals.__getitem__, reverse=True)
+
+        # Only build AgentScore objects for the agents we return
+        return [
+            self._build_score(agents[i], task_analysis, totals[i], rows[i], reasons[i])
+            for i in order
+        ]
 
     def _score_agent(self, agent: Dict[str, Any], task_analysis: Any,
                     performance_data: Dict[str, Any] = None) -> AgentScore:
         """Calculate comprehensive score for a single agent"""
-
-        agent_id = agent.get("agent_id", "unknown")
         match_reasons = []
-
-        # Calculate individual scores
-        capability_score = self._score_capabilities(agent, task_analysis, match_reasons)
-        domain_score = self._score_domain(agent, task_analysis, match_reasons)
-        keyword_score = self._score_keywords(agent, task_analysis, match_reasons)
-        performance_score = self._score_performance(agent, performance_data)
-        availability_score = self._score_availability(agent)
-        load_score = self._score_load(agent)
+        features = self._score_features(agent, _task_context(task_analysis), performance_data, match_reasons)
 
         # Calculate weighted total score
-        total_score = (
-            capability_score * self.weights["capability_match"] +
-            domain_score * self.weights["domain_match"] +
-            keyword_score * self.weights["keyword_match"] +
-            performance_score * self.weights["performance"] +
-            availability_score * self.weights["availability"] +
-            load_score * self.weights["load"]
+        total_score = sum(score * self.weights[name] for score, name in zip(features, _FEATURES))
+
+        return self._build_score(agent, task_analysis, total_score, features, match_reasons)
+
+    def _score_features(self, agent: Dict[str, Any], task: _TaskContext,
+                        performance_data: Optional[Dict[str, Any]],
+                        match_reasons: List[str],
+                        view: Optional[AgentView] = None) -> Tuple[float, ...]:
+        """Calculate the individual scores for an agent, in _FEATURES order"""
+        # Availability first: without a precomputed view, only status and last_seen are read
+        presence = (view.status, view.last_seen_ts) if view is not None else _agent_presence(agent)
+        availability = self._score_availability(*presence)
+
+        # Unavailable (offline) agents can't be recommended whatever their task fit, so
+        # skip normalization and the matching helpers: they score 0 on every task factor
+        # and get 0 confidence in _build_score, which get_top_recommendations filters out
+        if availability == 0.0:
+            return (0.0, 0.0, 0.0, 0.0, availability, self._score_load(agent))
+
+        if view is None:
+            # Not cached on the (caller-owned) dict
+            view = normalize_agent(agent, presence)
+
+        return (
+            self._score_capabilities(view, task, match_reasons),
+            self._score_domain(view, task, match_reasons),
+            self._score_keywords(view, task, match_reasons),
+            # Neutral 0.7 without performance data (the common case), skipping the helper
+            self._score_performance(agent, performance_data) if performance_data else 0.7,
+            availability,
+            self._score_load(agent)
         )
 
-        # Calculate confidence based on available data quality
-        confidence = self._calculate_confidence(agent, task_analysis)
+    def _build_score(self, agent: Dict[str, Any], task_analysis: Any, total_score: float,
+                     features: Tuple[float, ...], match_reasons: List[str]) -> AgentScore:
+        """Assemble the AgentScore for an agent from its computed scores"""
+        # Calculate confidence based on available data quality (none for unavailable agents)
+        if features[_AVAILABILITY] == 0.0:
+            confidence = 0.0
+        else:
+            confidence = self._calculate_confidence(agent, task_analysis)
 
         return AgentScore(
-            agent_id=agent_id,
+            agent_id=agent.get("agent_id", "unknown"),
             score=total_score,
             confidence=confidence,
             match_reasons=match_reasons,
-            metadata={
-                "capability_score": capability_score,
-                "domain_score": domain_score,
-                "keyword_score": keyword_score,
-                "performance_score": performance_score,
-                "availability_score": availability_score,
-                "load_score": load_score
-            }
+            metadata=dict(zip(_FEATURE_METADATA, features))
         )
 
-    def _score_capabilities(self, agent: Dict[str, Any], task_analysis: Any,
+    def _score_capabilities(self, agent: AgentView, task: _TaskContext,
                           match_reasons: List[str]) -> float:
         """Score based on capability matching"""
-        agent_capabilities = set(agent.get("capabilities", []))
-        required_capabilities = set(task_analysis.required_capabilities)
+        required_capabilities = task.capabilities
 
         if not required_capabilities:
             return 0.7  # Neutral score when no specific requirements
 
+        agent_capabilities = agent.capabilities
         if not agent_capabilities:
             return 0.3  # Low score for agents with no declared capabilities
 
         # Calculate overlap
-        matching_caps = agent_capabilities.intersection(required_capabilities)
+        matching_caps = agent_capabilities & required_capabilities
         match_ratio = len(matching_caps) / len(required_capabilities)
 
         if matching_caps:
@@ -118,11 +254,11 @@ class AgentRanker:
 
         return min(1.0, match_ratio)
 
-    def _score_domain(self, agent: Dict[str, Any], task_analysis: Any,
+    def _score_domain(self, agent: AgentView, task: _TaskContext,
                      match_reasons: List[str]) -> float:
         """Score based on domain expertise"""
-        agent_domain = agent.get("domain", "").lower()
-        task_domain = task_analysis.domain.lower()
+        agent_domain = agent.domain
+        task_domain = task.domain
 
         if task_domain == "general":
             return 0.7  # Neutral score for general tasks
@@ -141,31 +277,31 @@ class AgentRanker:
 
         return domain_similarity
 
-    def _score_keywords(self, agent: Dict[str, Any], task_analysis: Any,
+    def _score_keywords(self, agent: AgentView, task: _TaskContext,
                        match_reasons: List[str]) -> float:
         """Score based on keyword matching"""
-        agent_keywords = set(word.lower() for word in agent.get("keywords", []))
-        agent_description = agent.get("description", "").lower()
-        task_keywords = set(word.lower() for word in task_analysis.keywords)
+        agent_description = agent.description
+        task_keywords = task.keywords
 
         if not task_keywords:
             return 0.7  # Neutral score when no keywords
 
         # Direct keyword matches
-        direct_matches = agent_keywords.intersection(task_keywords)
-
-        # Keywords found in description
-        description_matches = set()
-        for keyword in task_keywords:
-            if keyword in agent_description:
-                description_matches.add(keyword)
-
-        all_matches = direct_matches.union(description_matches)
-
-        if all_matches:
+        matched = agent.keywords & task_keywords
+
+        # Keywords found in description, in a single automaton pass when available
+        if task.keyword_automaton is not None:
+            description_matches = {keyword for _, keyword in task.keyword_automaton.iter(agent_description)}
+        else:
+            description_matches = {keyword for keyword in task_keywords if keyword in agent_description}
+        if description_matches:
+            matched = matched | description_matches
+
+        if matched:
+            all_matches = [keyword for keyword in task_keywords if keyword in matched]
             match_reasons.append(f"Keyword matches: {', '.join(all_matches)}")
 
-        match_ratio = len(all_matches) / len(task_keywords) if task_keywords else 0
+        match_ratio = len(matched) / len(task_keywords)
         return min(1.0, match_ratio)
 
     def _score_performance(self, agent: Dict[str, Any],
@@ -193,11 +329,8 @@ class AgentRanker:
 
         return min(1.0, performance_score)
 
-    def _score_availability(self, agent: Dict[str, Any]) -> float:
+    def _score_availability(self, status: str, last_seen_ts: Optional[float]) -> float:
         """Score based on agent availability"""
-        status = agent.get("status", "unknown").lower()
-        last_seen_str = agent.get("last_seen")
-
         if status == "offline":
             return 0.0
         elif status == "busy":
@@ -206,21 +339,17 @@ class AgentRanker:
             return 1.0
 
         # If no explicit status, check last seen
-        if last_seen_str:
-            try:
-                last_seen = datetime.fromisoformat(last_seen_str.replace('Z', '+00:00'))
-                time_diff = datetime.now() - last_seen.replace(tzinfo=None)
-
-                if time_diff < timedelta(minutes=5):
-                    return 1.0
-                elif time_diff < timedelta(hours=1):
-                    return 0.8
-                elif time_diff < timedelta(days=1):
-                    return 0.5
-                else:
-                    return 0.2
-            except:
-                pass
+        if last_seen_ts is not None:
+            time_diff = time.time() - last_seen_ts
+
+            if time_diff < 300:  # 5 minutes
+                return 1.0
+            elif time_diff < 3600:  # 1 hour
+                return 0.8
+            elif time_diff < 86400:  # 1 day
+                return 0.5
+            else:
+                return 0.2
 
         return 0.5  # Default for unknown availability
 
@@ -233,6 +362,11 @@ class AgentRanker:
 
     def _calculate_domain_similarity(self, domain1: str, domain2: str) -> float:
         """Calculate similarity between domains"""
+        return self._domain_similarity.get((domain1, domain2), 0.2)  # 0.2 for unrelated domains
+
+    @staticmethod
+    def _build_domain_similarity() -> Dict[Tuple[str, str], float]:
+        """Expand the related-domain groups into a (domain1, domain2) -> similarity table"""
         related_domains = {
             "technology": ["software", "it", "programming", "tech"],
             "finance": ["banking", "trading", "accounting", "fintech"],
@@ -241,14 +375,17 @@ class AgentRanker:
             "education": ["learning", "training", "academic"]
         }
 
+        similarity = {}
         for main_domain, related in related_domains.items():
-            if domain1 in related and domain2 in related:
-                return 0.8
-            elif (domain1 == main_domain and domain2 in related) or \
-                 (domain2 == main_domain and domain1 in related):
-                return 0.9
-
-        return 0.2  # Low similarity for unrelated domains
+            # Two domains from the same related group
+            for domain1 in related:
+                for domain2 in related:
+                    similarity.setdefault((domain1, domain2), 0.8)
+            # A main domain and one of its related domains, either way round
+            for domain in related:
+                similarity.setdefault((main_domain, domain), 0.9)
+                similarity.setdefault((domain, main_domain), 0.9)
+        return similarity
 
     def _calculate_confidence(self, agent: Dict[str, Any], task_analysis: Any) -> float:
         """Calculate confidence in the scoring"""
@@ -281,7 +418,8 @@ class AgentRanker:
             if score.score >= min_score and score.confidence >= 0.4
         ]
 
-        return filtered[:limit]
+        # Best `limit` by score; input need not be sorted
+        return heapq.nlargest(limit, filtered, key=lambda x: x.score)
 
     def explain_ranking(self, agent_score: AgentScore) -> str:
         """Generate human-readable explanation for agent ranking"""
@@ -3,5 +3,8 @@
 Utility functions and helpers for the Streamlined NANDA Adapter
 """
 
-# Placeholder for future utilities
-__all__ = []
\ No newline at end of file
+from .http import create_http_session
+
+__all__ = [
+    "create_http_session"
+]
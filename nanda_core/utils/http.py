@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session factory for registry and agent traffic
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_http_session(pool_connections: int = 10, pool_maxsize: int = 50) -> requests.Session:
+    """Create a requests.Session with a keep-alive connection pool and retries"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
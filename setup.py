@@ -46,6 +46,8 @@ setup(
     extras_require={
         "dev": ["pytest", "pytest-asyncio", "black", "flake8"],
         "monitoring": ["prometheus-client", "grafana-api"],
+        "streaming": ["ijson>=3.1"],
+        "ranking": ["numpy", "pyahocorasick"],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures: a fake requests session for RegistryClient tests
+"""
+
+import io
+import json
+
+import pytest
+
+from nanda_core.core import registry_client
+from nanda_core.core.registry_client import RegistryClient
+
+
+class FakeRaw(io.BytesIO):
+    """Raw body stream that accepts the decode_content flag"""
+    decode_content = False
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in, usable as a streamed response"""
+
+    def __init__(self, payload=None, status_code=200):
+        self.status_code = status_code
+        self._body = json.dumps(payload).encode()
+        self.raw = FakeRaw(self._body)
+
+    def json(self):
+        return json.loads(self._body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Records requests; GET returns the agent list, POST/PUT answer from a script of
+    status codes or exceptions (200 once the script runs out)"""
+
+    def __init__(self, agents=None):
+        self.agents = agents or []
+        self.calls = []
+        self.script = {"post": [], "put": []}
+
+    def get(self, url, **kwargs):
+        self.calls.append(("get", url, None))
+        return FakeResponse(self.agents)
+
+    def post(self, url, json=None, **kwargs):
+        return self._answer("post", url, json)
+
+    def put(self, url, json=None, **kwargs):
+        return self._answer("put", url, json)
+
+    def _answer(self, method, url, body):
+        self.calls.append((method, url, body))
+        outcome = self.script[method].pop(0) if self.script[method] else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(status_code=outcome)
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def client(session, monkeypatch):
+    # Keep the background flusher idle so tests flush explicitly
+    monkeypatch.setattr(registry_client, "STATUS_FLUSH_INTERVAL", 3600.0)
+    client = RegistryClient(registry_url="http://registry.test")
+    client.session = session
+    yield client
+    client.close(timeout=1.0)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for SimpleAgentBridge's agent-to-agent message handling
+"""
+
+import threading
+
+import pytest
+from python_a2a import Message, MessageRole, Metadata, TextContent
+
+from nanda_core.core import agent_bridge
+from nanda_core.core.agent_bridge import SimpleAgentBridge
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+@pytest.fixture
+def bridge(received):
+    def logic(text, conversation_id):
+        received.append(text)
+        return f"echo {text}"
+
+    return SimpleAgentBridge("me", logic)
+
+
+def _envelope(text, metadata=None):
+    return Message(
+        role=MessageRole.USER,
+        content=TextContent(text=f"FROM: other\nTO: me\nMESSAGE: {text}"),
+        conversation_id="conv",
+        metadata=metadata
+    )
+
+
+def test_tagged_reply_is_displayed_not_answered(bridge, received):
+    response = bridge.handle_message(
+        _envelope("the answer", Metadata(custom_fields={"message_type": "agent_reply"}))
+    )
+
+    assert response.content.text == "[me] [other] the answer"
+    assert received == []
+
+
+def test_untagged_message_is_answered_with_tagged_reply(bridge, received):
+    response = bridge.handle_message(_envelope("hello"))
+
+    assert received == ["hello"]
+    assert response.content.text == "[me] Response to other: echo hello"
+    assert response.metadata.custom_fields["message_type"] == "agent_reply"
+    assert response.metadata.custom_fields["reply_to"] == "me"
+
+
+def test_untagged_legacy_reply_is_not_answered(bridge, received):
+    response = bridge.handle_message(_envelope("Response to me: the answer"))
+
+    assert response.content.text == "[me] [other] the answer"
+    assert received == []
+
+
+def test_user_text_starting_with_response_to_is_answered(bridge, received):
+    response = bridge.handle_message(_envelope("Response to the survey"))
+
+    assert received == ["Response to the survey"]
+    assert response.content.text.startswith("[me] Response to other:")
+
+
+def test_slow_client_construction_does_not_block_other_targets(bridge, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    class SlowClient:
+        def __init__(self, url, timeout=None):
+            self.url = url
+            if url == "http://slow/a2a":
+                started.set()
+                release.wait(5)
+
+    monkeypatch.setattr(agent_bridge, "A2AClient", SlowClient)
+    slow = threading.Thread(target=bridge._get_a2a_client, args=("http://slow/a2a",))
+    slow.start()
+    try:
+        assert started.wait(5)
+        done = threading.Event()
+
+        def other_target():
+            bridge._get_metadata_fields("fast")
+            bridge._get_a2a_client("http://fast/a2a")
+            done.set()
+
+        threading.Thread(target=other_target).start()
+        assert done.wait(1)
+    finally:
+        release.set()
+        slow.join()
+
+    assert bridge._get_a2a_client("http://slow/a2a").url == "http://slow/a2a"
+
+
+def _user_message(text, conversation_id=None):
+    return Message(role=MessageRole.USER, content=TextContent(text=text), conversation_id=conversation_id)
+
+
+def test_help_lists_replies_only_with_async_outbound(bridge):
+    assert "/replies" not in bridge.handle_message(_user_message("/help")).content.text
+
+    async_bridge = SimpleAgentBridge("me", lambda text, conversation_id: text, async_outbound=True)
+    assert "/replies" in async_bridge.handle_message(_user_message("/help")).content.text
+
+
+def test_async_reply_is_fetched_from_acknowledged_conversation(monkeypatch):
+    monkeypatch.setattr(SimpleAgentBridge, "_send_to_agent",
+                        lambda self, target, text, conversation_id: f"[{target}] got {text}")
+    async_bridge = SimpleAgentBridge("me", lambda text, conversation_id: text, async_outbound=True)
+
+    ack = async_bridge.handle_message(_user_message("@other hi")).content.text
+    conversation_id = ack.split("conversation ", 1)[1].split(" ", 1)[0]
+    async_bridge._outbound.shutdown(wait=True)
+
+    reply = async_bridge.handle_message(_user_message("/replies", conversation_id)).content.text
+    assert reply == "[me] [other] got hi"
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for AgentDiscovery's agent catalog index
+"""
+
+import pytest
+
+from nanda_core.discovery import agent_discovery
+from nanda_core.discovery.agent_discovery import AgentDiscovery, CatalogIndex
+from nanda_core.discovery.task_analyzer import TaskAnalysis
+
+
+AGENTS = [
+    {"agent_id": "data-agent", "description": "Data analysis", "domain": "Technology",
+     "capabilities": ["analysis"], "keywords": ["charts"]},
+    {"agent_id": "null-agent", "description": None, "domain": None, "keywords": ["translation"]},
+    {"agent_id": "data-agent", "description": "duplicate entry"},
+    {"description": "anonymous scraping agent", "capabilities": ["scraping"]},
+    {"agent_id": "web-agent", "description": "Web scraping", "capabilities": ["scraping"]},
+]
+
+
+def _task(keywords=(), capabilities=(), domain="general"):
+    return TaskAnalysis(task_type="analysis", complexity="simple", domain=domain,
+                        keywords=list(keywords), required_capabilities=list(capabilities),
+                        confidence=0.9, description="")
+
+
+@pytest.fixture
+def catalog():
+    return CatalogIndex.build(AGENTS)
+
+
+def test_build_keeps_first_entry_per_id_and_agents_without_one(catalog):
+    assert list(catalog.agents.values()) == [AGENTS[0], AGENTS[1], AGENTS[3], AGENTS[4]]
+    assert catalog.views["data-agent"].domain == "technology"
+
+
+def test_null_description_is_not_indexed_as_a_token(catalog):
+    assert "none" not in catalog.keywords
+    assert catalog.lookup(_task(keywords=["translation"])) == [AGENTS[1]]
+
+
+def test_lookup_unions_indices_in_catalog_order(catalog):
+    agents = catalog.lookup(_task(keywords=["web"], capabilities=["scraping", "analysis"],
+                                  domain="technology"))
+
+    assert agents == [AGENTS[0], AGENTS[3], AGENTS[4]]
+    assert catalog.lookup(_task(keywords=["nothing"])) == []
+
+
+def test_views_for_only_reuses_views_of_catalog_agents(catalog):
+    views = catalog.views_for([AGENTS[0], AGENTS[2], AGENTS[3]])
+
+    assert views[0] is catalog.views["data-agent"]
+    assert views[1] is None  # duplicate dropped at build time
+    assert views[2] is None  # no agent_id to look it up by
+
+
+class _Registry:
+    """Registry client stand-in whose /list can be switched between failing and working"""
+
+    def __init__(self):
+        self.agents = []
+        self.list_calls = 0
+
+    def list_agents(self):
+        self.list_calls += 1
+        return self.agents
+
+
+def test_failed_catalog_load_backs_off_until_refresh_interval(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(agent_discovery.time, "monotonic", lambda: now[0])
+    registry = _Registry()
+    discovery = AgentDiscovery(registry_client=registry)
+    try:
+        assert discovery._get_catalog_index() is None
+        registry.agents = AGENTS
+        assert discovery._get_catalog_index() is None
+        assert registry.list_calls == 1
+
+        now[0] += agent_discovery.CATALOG_REFRESH_INTERVAL
+        catalog = discovery._get_catalog_index()
+        assert catalog is not None and "web-agent" in catalog.agents
+        assert registry.list_calls == 2
+    finally:
+        discovery.stop()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for AgentRanker scoring
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from nanda_core.discovery import agent_ranker
+from nanda_core.discovery.agent_ranker import AgentRanker, normalize_agent
+
+
+AGENTS = [
+    {"agent_id": "data-agent", "description": "Data analysis and charts", "domain": "technology",
+     "keywords": ["Data", "python"], "capabilities": ["analysis"], "status": "online"},
+    {"agent_id": "web-agent", "description": "Web scraping", "domain": "software",
+     "keywords": ["web"], "capabilities": ["scraping"], "status": "busy"},
+    {"agent_id": "gone-agent", "description": "Data analysis", "domain": "technology",
+     "keywords": ["data"], "capabilities": ["analysis"], "status": "offline"},
+]
+
+
+@pytest.fixture
+def task():
+    return SimpleNamespace(keywords=["data", "charts", "python"], required_capabilities=["analysis"],
+                           domain="technology", confidence=0.9)
+
+
+def _summary(scores):
+    return [(s.agent_id, s.score, s.confidence, s.match_reasons, s.metadata) for s in scores]
+
+
+def test_precomputed_views_rank_like_raw_agents(task):
+    ranker = AgentRanker()
+
+    expected = ranker.rank_agents(AGENTS, task)
+    ranked = ranker.rank_agents(AGENTS, task, views=[normalize_agent(a) for a in AGENTS])
+
+    assert _summary(ranked) == _summary(expected)
+    assert expected[0].agent_id == "data-agent"
+    # "charts" only appears in the description
+    assert expected[0].metadata["keyword_score"] == 1.0
+
+
+def test_missing_views_fall_back_to_normalizing(task):
+    ranker = AgentRanker()
+    views = [normalize_agent(AGENTS[0]), None, None]
+
+    assert _summary(ranker.rank_agents(AGENTS, task, views=views)) == _summary(ranker.rank_agents(AGENTS, task))
+
+
+def test_offline_agents_skip_normalization(task, monkeypatch):
+    normalized = []
+    real = agent_ranker.normalize_agent
+    monkeypatch.setattr(agent_ranker, "normalize_agent",
+                        lambda agent, presence=None: normalized.append(agent["agent_id"]) or real(agent, presence))
+
+    scores = {s.agent_id: s for s in AgentRanker().rank_agents(AGENTS, task)}
+
+    assert normalized == ["data-agent", "web-agent"]
+    assert scores["gone-agent"].confidence == 0.0
+    assert scores["gone-agent"].metadata["keyword_score"] == 0.0
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for RegistryClient's local-search fallback and status update batching
+"""
+
+import pytest
+
+from nanda_core.core import registry_client
+from nanda_core.discovery.agent_ranker import AgentRanker
+
+
+AGENTS = [
+    {"agent_id": "data-agent", "description": "data analysis", "current_load": 0.25},
+    {"agent_id": "null-agent", "description": None, "current_load": 0.5},
+    {"agent_id": "web-agent", "description": "web scraping", "current_load": 0.75},
+]
+
+
+@pytest.fixture
+def session(session):
+    session.agents = AGENTS
+    return session
+
+
+def _queue(client, *agent_ids):
+    for agent_id in agent_ids:
+        client.update_agent_status(agent_id, "online")
+
+
+def _sent(session, method):
+    return [body for call, _, body in session.calls if call == method]
+
+
+def test_streamed_agents_keep_float_fields(client):
+    pytest.importorskip("ijson")
+    assert registry_client.ijson is not None
+
+    agents = client._filter_agents_locally(query="data")
+
+    assert [a["agent_id"] for a in agents] == ["data-agent"]
+    assert type(agents[0]["current_load"]) is float
+    assert AgentRanker()._score_load(agents[0]) == pytest.approx(0.75)
+
+
+def test_null_description_does_not_drop_matches(client):
+    agents = client._filter_agents_locally(query="web")
+
+    assert [a["agent_id"] for a in agents] == ["web-agent"]
+
+
+def test_status_updates_are_buffered_and_sent_in_one_batch(client, session):
+    _queue(client, "a", "b")
+    assert session.calls == []
+
+    assert client.flush_status_updates()
+
+    [batch] = _sent(session, "post")
+    assert [update["agent_id"] for update in batch] == ["a", "b"]
+    assert len(client._status_buffer) == 0
+
+
+@pytest.mark.parametrize("failure", [500, 503, 429, ConnectionError("registry down")])
+def test_transient_bulk_failure_requeues_batch(client, session, failure):
+    _queue(client, "a", "b")
+    session.script["post"] = [failure]
+
+    assert not client.flush_status_updates()
+    _queue(client, "c")
+    assert [update["agent_id"] for update in client._status_buffer] == ["a", "b", "c"]
+
+    assert client.flush_status_updates()
+    assert [update["agent_id"] for update in _sent(session, "post")[-1]] == ["a", "b", "c"]
+
+
+def test_permanent_bulk_failure_drops_batch(client, session):
+    _queue(client, "a")
+    session.script["post"] = [400]
+
+    assert not client.flush_status_updates()
+    assert len(client._status_buffer) == 0
+    assert client._bulk_status_supported
+
+
+@pytest.mark.parametrize("status_code", [404, 405])
+def test_missing_bulk_endpoint_falls_back_to_per_agent_updates(client, session, status_code):
+    _queue(client, "a", "b")
+    session.script["post"] = [status_code]
+
+    assert client.flush_status_updates()
+    assert not client._bulk_status_supported
+    assert [update["agent_id"] for update in _sent(session, "put")] == ["a", "b"]
+
+    _queue(client, "c")
+    assert client.flush_status_updates()
+    assert len(_sent(session, "post")) == 1
+
+
+def test_per_agent_fallback_requeues_only_transient_failures(client, session):
+    client._bulk_status_supported = False
+    _queue(client, "a", "b", "c")
+    session.script["put"] = [200, 503, 400]
+
+    assert not client.flush_status_updates()
+    assert [update["agent_id"] for update in client._status_buffer] == ["b"]
+
+
+def test_buffer_overflow_discards_oldest_and_counts_them(client, monkeypatch):
+    monkeypatch.setattr(registry_client, "STATUS_BUFFER_MAX_SIZE", 3)
+    _queue(client, "a", "b", "c", "d", "e")
+
+    assert [update["agent_id"] for update in client._status_buffer] == ["c", "d", "e"]
+    assert client.buffer_discarded_events_total == 2
+
+    # A failed batch that no longer fits behind newer updates loses its oldest entries
+    assert client.flush_status_updates()
+    _queue(client, "f", "g")
+    client._requeue_status_updates([{"agent_id": "x"}, {"agent_id": "y"}])
+    assert [update["agent_id"] for update in client._status_buffer] == ["y", "f", "g"]
+    assert client.buffer_discarded_events_total == 3
+
+
+def test_close_stops_flusher_and_sends_buffered_updates(client, session):
+    _queue(client, "a")
+    thread = client._status_thread
+    assert thread.is_alive()
+
+    client.close(timeout=1.0)
+
+    assert not thread.is_alive()
+    assert client._status_thread is None
+    assert [update["agent_id"] for update in _sent(session, "post")[0]] == ["a"]